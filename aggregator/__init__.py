@@ -19,15 +19,14 @@ def walk_package(path=None, name=__name__):
 
 
 def _config_logging(config=None, *args, **kwargs):
+    if config and not config.getbool('LOG_ENABLED'):
+        return
+
     import logging
-    import sys
     from logging.config import dictConfig
 
     from .logger import make_logging_config
 
-    if config and not config.getbool('LOG_ENABLED'):
-        return
-
     if config:
         kwargs = {
             'level': config.get('LOG_LEVEL', logging.INFO),
@@ -42,6 +41,8 @@ def _config_logging(config=None, *args, **kwargs):
             kwargs['datefmt'] = config['LOG_DATEFORMAT']
 
         if config.get('LOG_STDOUT'):
+            import sys
+
             from scrapy.utils.log import StreamLogger
             sys.stdout = StreamLogger(logging.getLogger('stdout'))
 
@@ -26,12 +26,9 @@ from pathlib import Path
 from textwrap import dedent
 
 import click
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
 
 from . import _config_logging, exporters
 from .docs import markdown_inline, numpydoc2click
-from .sql.cli import check, leftovers, merge, migrate
 
 get_help_gen = markdown_inline(lambda ctx: (yield ctx.get_help()))
 
@@ -148,6 +145,9 @@ def export(topic, exporter_args, **kwargs):
 @click.option('-s', 'spider')
 @click.option('-p', 'preset')
 def run_spider(spider, preset, **kwargs):
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
     settings = get_project_settings()
     settings['PRESET'] = preset
     process = CrawlerProcess(settings, install_root_handler=False)
@@ -164,6 +164,7 @@ def run_spider(spider, preset, **kwargs):
 def check_db(ctx, db_path, debug=False, **kwargs):
     """Check a database for potential problems and inconsistencies."""
 
+    from .sql.cli import check
     ctx.exit(check(ensure_index_db(db_path), debug=debug))
 
 
@@ -176,6 +177,7 @@ def check_db(ctx, db_path, debug=False, **kwargs):
 def upgrade_db(ctx, db_path, debug=False, **kwargs):
     """Upgrade an older database to the latest schema version."""
 
+    from .sql.cli import migrate
     ctx.exit(migrate(ensure_index_db(db_path), debug=debug))
 
 
@@ -190,6 +192,7 @@ def upgrade_db(ctx, db_path, debug=False, **kwargs):
 def merge_db(ctx, *, db_paths, output, debug=False, **kwargs):
     """Merge multiple databases into a new database."""
 
+    from .sql.cli import merge
     ctx.exit(merge(output, *db_paths, debug=debug))
 
 
@@ -202,6 +205,7 @@ def merge_db(ctx, *, db_paths, output, debug=False, **kwargs):
 def cleanup(ctx, wd, debug=False, **kwargs):
     """Find all temporary databases and attempt to merge them into the main database."""
 
+    from .sql.cli import leftovers
     ctx.exit(leftovers(wd, debug=debug))
 
 
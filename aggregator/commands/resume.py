@@ -20,9 +20,9 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import json
 from pathlib import Path
 
-import simplejson as json
 from scrapy.commands import ScrapyCommand
 from scrapy.exceptions import UsageError
 
@@ -52,15 +52,15 @@ def _disable_initial_log():
 
 class _LoggingMixin:
     def _takeover_logging(self, force=False):
-        from scrapy.utils.log import configure_logging
-
-        from .. import _config_logging
-
         enabled = (self.settings.getbool('LOG_ENABLED')
                    and self.settings.getbool('CUSTOM_LOGGING_ENABLED', True))
         if not force and not enabled:
             return
 
+        from scrapy.utils.log import configure_logging
+
+        from .. import _config_logging
+
         settings = self.settings
         configure_logging(install_root_handler=False)
         _config_logging(settings)
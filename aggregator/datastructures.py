@@ -121,7 +121,7 @@ class KeywordStore:
         for k in index:
             this = self._taggings.get(k, {})
             that = other._taggings.get(k, {})
-            tagging = {t: this.get(t, set()) | that.get(t, set()) for t in this.keys() & that.keys()}
+            tagging = {t: this[t] | that[t] for t in this.keys() & that.keys()}
             tagging.update({t: this[t] for t in this.keys() - that.keys()})
             tagging.update({t: that[t] for t in that.keys() - this.keys()})
             taggings[k] = tagging
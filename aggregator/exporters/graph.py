@@ -37,14 +37,14 @@ log = logging.getLogger('exporter.graph')
 def filter_vertices(g, vertex_ids, include, exclude):
     if include or exclude:
         log.info('Filtering graph')
-        vertex_ids = {f'http://{k}': i for k, i in vertex_ids.items()}
+        predicates = []
         if include:
-            vertex_ids = {k: i for k, i in vertex_ids.items()
-                          if filter_by_domains(include)(k)}
+            predicates.append(filter_by_domains(include))
         if exclude:
-            vertex_ids = {k: i for k, i in vertex_ids.items()
-                          if filter_by_domains(exclude, True)(k)}
-        g = g.subgraph(vertex_ids.values())
+            predicates.append(filter_by_domains(exclude, True))
+        vertex_ids = [i for k, i in vertex_ids.items()
+                      if all(p(f'http://{k}') for p in predicates)]
+        g = g.subgraph(vertex_ids)
     return g
 
 
@@ -102,13 +102,14 @@ def export(conn: sqlite3.Connection, wd: Path, output: Path,
     for feed in conn.execute(select_feeds):
         del domains[feed[0]]
 
+    predicates = []
     if include:
-        domains = {k: v for k, v in domains.items()
-                   if filter_by_domains(include)(k)}
-
+        predicates.append(filter_by_domains(include))
     if exclude:
+        predicates.append(filter_by_domains(exclude, True))
+    if predicates:
         domains = {k: v for k, v in domains.items()
-                   if filter_by_domains(exclude, True)(k)}
+                   if all(p(k) for p in predicates)}
 
     with open(output / fmt, 'w+') as f:
         json.dump(domains, f)
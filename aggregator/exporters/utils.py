@@ -27,11 +27,10 @@ import sqlite3
 from functools import wraps
 from pathlib import Path
 
-from scrapy.utils.url import url_is_from_any_domain
-
 from ..datastructures import labeled_sequence
 from ..sql.db import db
 from ..sql.functions import register_all
+from ..urlkit import is_under_domains
 
 log = logging.getLogger('exporter.utils')
 
@@ -134,10 +133,11 @@ def with_db(exporter):
 
 
 def filter_by_domains(ls, exclude=False):
-    domains = []
+    domains = set()
     for key, op, val in ls:
         if key != 'domain' or op != 'under':
             log.warning(f'Unknown filter {key} {op}')
             continue
-        domains.append(val)
-    return lambda u: url_is_from_any_domain(u, domains) ^ exclude
+        domains.add(val.lower())
+    domains = frozenset(domains)
+    return lambda u: is_under_domains(u, domains) ^ exclude
@@ -22,6 +22,7 @@
 
 import atexit
 import gzip
+import json
 import logging
 import os
 import pickle
@@ -32,12 +33,11 @@ from concurrent.futures.thread import ThreadPoolExecutor
 from contextlib import suppress
 from datetime import datetime, timedelta
 from importlib.util import module_from_spec, spec_from_file_location
-from itertools import permutations
+from itertools import product
 from pathlib import Path
 from statistics import mean, mode
-from threading import Event, Thread
+from threading import Condition, Event, Lock, Thread
 
-import simplejson as json
 from scrapy.crawler import Crawler
 from scrapy.exceptions import NotConfigured
 from scrapy.extensions.logstats import LogStats
@@ -54,7 +54,12 @@ from .signals import (register_state, request_finished, resume_requests,
                       show_stats)
 from .spiders.settings import SettingsAdapter
 from .utils import colored as _
-from .utils import fmttimedelta, sha1sum
+from .utils import fmttimedelta, json_dumpb, json_loadb, sha1sum
+
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+GZIP_COMPRESSLEVEL = 3
+
+FROZEN_REQUEST_FIELDS = ('url', 'method', 'callback', 'meta', 'priority')
 
 
 class _LoggingHelper:
@@ -179,6 +184,9 @@ class SettingsLoader:
 
 
 class GlobalPersistence:
+    batch_size = 256
+    state_interval = 20
+
     @classmethod
     def from_crawler(cls, crawler):
         instance = cls(crawler)
@@ -207,6 +215,7 @@ class GlobalPersistence:
         self.path_archive = output / 'scheduled' / 'freezer'
 
         self.closing = Event()
+        self.pending = Condition()
         self.thread = Thread(None, target=self.worker, name='RequestPersistenceThread',
                              args=(self.closing,), daemon=True)
         self.future = None
@@ -222,9 +231,17 @@ class GlobalPersistence:
         self.dump_opts()
 
     def worker(self, closing: Event):
-        while not closing.wait(20):
+        next_dump = time.monotonic() + self.state_interval
+        while not closing.is_set():
+            with self.pending:
+                self.pending.wait(max(next_dump - time.monotonic(), 0))
+            if closing.is_set():
+                break
             try:
-                self.archive()
+                self.freezer.flush()
+                if time.monotonic() >= next_dump:
+                    next_dump = time.monotonic() + self.state_interval
+                    self.dump_state()
             except Exception as e:
                 self.logger.error(e, exc_info=True)
         self.archive()
@@ -240,8 +257,8 @@ class GlobalPersistence:
         return {}
 
     def dump_state(self):
-        with gzip.open(self.path_state, 'wb+') as f, suppress(RuntimeError):
-            pickled = pickle.dumps(self.state)
+        with gzip.open(self.path_state, 'wb+', compresslevel=GZIP_COMPRESSLEVEL) as f, suppress(RuntimeError):
+            pickled = pickle.dumps(self.state, protocol=PICKLE_PROTOCOL)
             f.write(pickled)
 
     def dump_opts(self):
@@ -261,9 +278,16 @@ class GlobalPersistence:
     def freeze_request(self, request, spider=None):
         request.meta['_time_scheduled'] = time.time()
         self.freezer.add(request)
+        self.wake_worker()
 
     def request_done(self, request, spider=None):
         self.freezer.remove(request)
+        self.wake_worker()
+
+    def wake_worker(self):
+        if len(self.freezer.buffer) >= self.batch_size:
+            with self.pending:
+                self.pending.notify()
 
     def resume_crawl(self, spider):
         if self.path_archive.exists():
@@ -274,11 +298,16 @@ class GlobalPersistence:
         if self.closing.is_set():
             return
         self.closing.set()
+        with self.pending:
+            self.pending.notify_all()
         self.thread.join(2)
         self.archive()
+        self.freezer.compact()
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         num_requests = len(self.freezer)
         if num_requests:
-            self.logger.info(_(f'# of requests persisted to filesystem: {num_requests}', color='cyan'))
+            self.logger.info(_('# of requests persisted to filesystem: %d', color='cyan'), num_requests)
 
     def rmjobdir(self):
         with suppress(Exception):
@@ -286,24 +315,25 @@ class GlobalPersistence:
 
 
 class RequestFreezer:
+    compact_ratio = 4
+    compact_min_size = 4 * 1024 ** 2
+
     def __init__(self, path):
         self.wd = Path(path)
         self.path = self.wd / 'frozen'
+        self.journal_path = self.wd / 'journal'
         os.makedirs(self.path, exist_ok=True)
         self.buffer = deque()
+        self.lock = Lock()
+        self.snapshot_bytes = self.snapshot_size()
 
     def add(self, request):
         key = request.meta.get('pkey')
         if not key:
             return
-        for_pickle = {
-            'url': request.url,
-            'method': request.method,
-            'callback': request.callback.__name__,
-            'meta': {**request.meta},
-            'priority': request.priority,
-        }
-        self.buffer.append(('add', key, (request.__class__, for_pickle)))
+        row = (request.url, request.method, request.callback.__name__,
+               {**request.meta}, request.priority)
+        self.buffer.append(('add', key, (request.__class__, row)))
 
     def remove(self, request):
         key = request.meta.get('pkey')
@@ -312,10 +342,31 @@ class RequestFreezer:
         self.buffer.append(('remove', key, None))
 
     def flush(self):
-        shelves = {}
+        # deque.append() and deque.popleft() are each atomic, so draining
+        # the buffer here is safe while the reactor thread keeps appending.
         buffer = self.buffer
-        self.buffer = deque()
-        for action, key, item in buffer:
+        batch = []
+        while True:
+            try:
+                batch.append(buffer.popleft())
+            except IndexError:
+                break
+        with self.lock:
+            if batch:
+                with open(self.journal_path, 'ab') as f:
+                    pickle.dump(batch, f, protocol=PICKLE_PROTOCOL)
+            threshold = max(self.snapshot_bytes * self.compact_ratio, self.compact_min_size)
+            if self.journal_size() > threshold:
+                self._compact()
+        del batch
+
+    def compact(self):
+        with self.lock:
+            self._compact()
+
+    def _compact(self):
+        shelves = {}
+        for action, key, item in self.replay():
             hash_ = sha1sum(pickle.dumps(key))
             label = hash_[:2]
             shelf = shelves.get(label)
@@ -327,7 +378,31 @@ class RequestFreezer:
                 shelf.pop(hash_, None)
         self.persist(shelves)
         del shelves
-        del buffer
+        with suppress(FileNotFoundError):
+            os.unlink(self.journal_path)
+        self.snapshot_bytes = self.snapshot_size()
+
+    def replay(self):
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            while True:
+                try:
+                    yield from pickle.load(f)
+                except (EOFError, pickle.UnpicklingError):
+                    return
+
+    def journal_size(self):
+        try:
+            return os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return 0
+
+    def snapshot_size(self):
+        with os.scandir(self.path) as entries:
+            return sum(e.stat().st_size for e in entries if e.is_file())
 
     def open_shelf(self, shelf, path=None):
         path = path or self.path / shelf
@@ -341,8 +416,8 @@ class RequestFreezer:
         path = path or self.path
         for shelf, items in shelves.items():
             shelf = path / shelf
-            with gzip.open(shelf, 'wb') as f:
-                pickle.dump(items, f)
+            with gzip.open(shelf, 'wb', compresslevel=GZIP_COMPRESSLEVEL) as f:
+                pickle.dump(items, f, protocol=PICKLE_PROTOCOL)
 
     def copy(self, src, dst):
         def cp(shelf):
@@ -359,12 +434,15 @@ class RequestFreezer:
     def defrost(self, spider):
         info = self.load_info()
         defroster_path = self.wd / 'defrosting'
-        if defroster_path.exists():
-            self.copy(self.path, defroster_path)
-            shutil.rmtree(self.path)
-        else:
-            shutil.move(self.path, defroster_path)
-        os.makedirs(self.path)
+        with self.lock:
+            self._compact()
+            if defroster_path.exists():
+                self.copy(self.path, defroster_path)
+                shutil.rmtree(self.path)
+            else:
+                shutil.move(self.path, defroster_path)
+            os.makedirs(self.path)
+            self.snapshot_bytes = 0
         self.dump_info(info)
 
         defroster = RequestDefroster(defroster_path)
@@ -373,23 +451,27 @@ class RequestFreezer:
         shutil.rmtree(defroster_path, ignore_errors=True)
 
     def clear(self):
-        shutil.rmtree(self.path)
-        self.path.mkdir()
+        with self.lock:
+            with suppress(FileNotFoundError):
+                os.unlink(self.journal_path)
+            shutil.rmtree(self.path)
+            self.path.mkdir()
+            self.snapshot_bytes = 0
 
     def load_info(self):
         info = {}
         with suppress(EOFError, FileNotFoundError,
-                      json.JSONDecodeError, gzip.BadGzipFile):
-            with open(self.path / 'info.json') as f:
-                return json.load(f)
+                      ValueError, gzip.BadGzipFile):
+            with open(self.path / 'info.json', 'rb') as f:
+                return json_loadb(f.read())
         return info
 
     def dump_info(self, info):
-        with open(self.path / 'info.json', 'w+') as f:
-            json.dump(info, f)
+        with open(self.path / 'info.json', 'wb+') as f:
+            f.write(json_dumpb(info))
 
     def names(self):
-        return permutations('0123456789abcdef', 2)
+        return product('0123456789abcdef', repeat=2)
 
     def __len__(self):
         length = 0
@@ -413,7 +495,10 @@ class RequestDefroster(RequestFreezer):
         for i, j in self.names():
             name = i + j
             shelf = self.open_shelf(name)
-            yield from shelf.values()
+            for cls, row in shelf.values():
+                if not isinstance(row, dict):
+                    row = dict(zip(FROZEN_REQUEST_FIELDS, row))
+                yield cls, row
             with suppress(FileNotFoundError):
                 os.unlink(self.path / name)
 
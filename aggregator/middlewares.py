@@ -22,23 +22,41 @@
 
 import logging
 from contextlib import suppress
-from urllib.parse import urlsplit
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 from scrapy.exceptions import DontCloseSpider, IgnoreRequest, NotConfigured
 from scrapy.http import Request, Response
 from scrapy.signals import spider_idle
 from scrapy.spidermiddlewares.depth import DepthMiddleware
-from scrapy.utils.url import url_is_from_any_domain
-from twisted.internet.defer import DeferredList
+from twisted.internet.defer import DeferredList, DeferredSemaphore
 from twisted.python.failure import Failure
 
 from .docs import OptionsContributor
 from .feedly import build_api_url, get_feed_uri
 from .requests import ProbeFeed
 from .signals import request_finished, show_stats
+from .urlkit import is_under_domains
 from .utils import colored as _
 from .utils import guard_json, is_rss_xml, wait
 
+FEEDLY_API_PREFIXES = ('https://cloud.feedly.com/', 'http://cloud.feedly.com/')
+LIVE_FEED_STATUS = frozenset({200, 206, 405})
+DEFAULT_RETRY_AFTER = 60
+
+
+def parse_retry_after(value: bytes, default: int = DEFAULT_RETRY_AFTER) -> float:
+    value = value.decode('latin_1').strip()
+    if value.isascii() and value.isdigit():
+        return int(value)
+    try:
+        until = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return default
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return max((until - datetime.now(timezone.utc)).total_seconds(), 0)
+
 
 class ConditionalDepthSpiderMiddleware(DepthMiddleware):
     @classmethod
@@ -53,23 +71,37 @@ class ConditionalDepthSpiderMiddleware(DepthMiddleware):
         if not self.maxdepth:
             self.maxdepth = spider.config.getint('DEPTH_LIMIT')
         should_increase = []
-        other_items = []
         for r in result:
-            if not isinstance(r, Request):
-                other_items.append(r)
-                continue
-            increase_in = r.meta.get('inc_depth', 0)
-            if increase_in == 1:
+            if self.should_increase(r):
                 should_increase.append(r)
-                continue
-            if increase_in > 1:
-                r.meta['inc_depth'] = increase_in - 1
-            other_items.append(r)
-        other_items.extend(super().process_spider_output(response, should_increase, spider))
-        return other_items
+            else:
+                yield r
+        yield from super().process_spider_output(response, should_increase, spider)
+
+    async def process_spider_output_async(self, response, result, spider):
+        if not self.maxdepth:
+            self.maxdepth = spider.config.getint('DEPTH_LIMIT')
+        should_increase = []
+        async for r in result:
+            if self.should_increase(r):
+                should_increase.append(r)
+            else:
+                yield r
+        for r in super().process_spider_output(response, should_increase, spider):
+            yield r
 
+    def should_increase(self, r):
+        if not isinstance(r, Request):
+            return False
+        increase_in = r.meta.get('inc_depth', 0)
+        if increase_in == 1:
+            return True
+        if increase_in > 1:
+            r.meta['inc_depth'] = increase_in - 1
+        return False
 
-class FeedProbingDownloaderMiddleware:
+
+class FeedProbingDownloaderMiddleware(OptionsContributor):
     @classmethod
     def from_crawler(cls, crawler):
         crawler.signals.send_catch_log(show_stats, names=[
@@ -83,6 +115,7 @@ class FeedProbingDownloaderMiddleware:
         self.logger = logging.getLogger('worker.prober')
         self.test_status = crawler.settings.get('SELECT_FEED_STATE', 'all') in {'dead', 'dead+', 'alive', 'alive+'}
         self.stats = crawler.stats
+        self.semaphore = DeferredSemaphore(crawler.settings.getint('PROBE_CONCURRENCY', 16))
 
     async def process_request(self, request: ProbeFeed, spider):
         if not isinstance(request, ProbeFeed):
@@ -92,36 +125,36 @@ class FeedProbingDownloaderMiddleware:
         meta = request.meta
         feeds = meta['try_feeds']
         query = meta['feed_url']
-        valid_feeds = []
 
-        self.logger.info(_(f'Probing {query}', color='grey'))
+        self.logger.info(_('Probing %s', color='grey'), query)
         self.stats.inc_value('feedprober/attempts')
 
-        queries = []
-        for feed_id in feeds:
-            url = spider.get_streams_url(feed_id, count=1)
-            queries.append(download(Request(url, meta={'feed': feed_id}), spider))
+        run = self.semaphore.run
+        get_streams_url = spider.get_streams_url
+        queries = [run(download, Request(get_streams_url(feed_id, count=1), meta={'feed': feed_id}), spider)
+                   for feed_id in feeds]
         results = await DeferredList(queries, consumeErrors=True)
 
+        get_feed_info = self.feed_info
         valid_feeds = {}
         feed_info = {}
         for successful, response in results:
             if not successful:
                 continue
-            data = guard_json(response.text)
+            data = guard_json(response.body)
             if data.get('items'):
                 feed = response.meta['feed']
                 valid_feeds[feed] = None
-                feed_info[feed] = self.feed_info(data)
+                feed_info[feed] = get_feed_info(data)
 
         if not valid_feeds and spider.config.getbool('ENABLE_SEARCH'):
             response = await spider.crawler.engine.download(Request(build_api_url('search', query=query)), spider)
-            data = guard_json(response.text)
+            data = guard_json(response.body)
             if data.get('results'):
                 for feed in data['results']:
                     feed_id = feed['feedId']
                     valid_feeds[feed_id] = None
-                    feed_info[feed_id] = self.feed_info(data)
+                    feed_info[feed_id] = get_feed_info(data)
 
         if self.test_status:
             await self.probe_feed_status(valid_feeds, download, spider)
@@ -144,33 +177,39 @@ class FeedProbingDownloaderMiddleware:
         }
 
     async def probe_feed_status(self, feeds, download, spider):
-        requests = []
-        for feed in feeds:
-            requests.append(download(Request(
-                get_feed_uri(feed), method='HEAD', meta={
-                    'url': feed,
-                    'max_retry_times': 0,
-                    'download_timeout': 20,
-                }), spider))
+        run = self.semaphore.run
+        requests = [run(download, Request(
+            get_feed_uri(feed), method='HEAD', meta={
+                'url': feed,
+                'max_retry_times': 0,
+                'download_timeout': 20,
+            }), spider) for feed in feeds]
 
         results = await DeferredList(requests, consumeErrors=True)
 
         for successful, response in results:
             if isinstance(response, Failure):
-                if not isinstance(response.value, Request):
-                    continue
-                response = response.value
-                dead = True
-            elif not successful:
-                dead = True
-            elif response.status not in {200, 206, 405}:
-                dead = True
-            elif not is_rss_xml(response):
-                dead = True
-            else:
-                dead = False
+                if isinstance(response.value, Request):
+                    feeds[response.value.meta['url']] = True
+                continue
+            dead = (not successful
+                    or response.status not in LIVE_FEED_STATUS
+                    or not is_rss_xml(response))
             feeds[response.meta['url']] = dead
 
+    @staticmethod
+    def _help_options():
+        return {
+            'PROBE_CONCURRENCY': """
+            Maximum number of feed probing requests (Feedly stream lookups and HEAD requests
+            sent to check whether a feed is dead) that may be in progress at the same time.
+            Default is `16`.
+
+            Feeds with many RSS templates generate many probing requests at once; a lower
+            setting keeps them from crowding out other requests in the downloader.
+            """,
+        }
+
 
 class RequestPersistenceDownloaderMiddleware:
     @classmethod
@@ -225,17 +264,19 @@ class OffsiteFeedSpiderMiddleware:
         return cls(crawler.settings)
 
     def __init__(self, settings):
-        self.domains = settings.get('FOLLOW_DOMAINS')
-        if not self.domains:
+        domains = settings.get('FOLLOW_DOMAINS')
+        if not domains:
             raise NotConfigured()
+        self.domains = frozenset(d.lower() for d in domains)
 
     def process_spider_output(self, response, result, spider):
+        domains = self.domains
         for r in result:
             if not isinstance(r, Request):
                 yield r
                 continue
             feed_url = r.meta.get('feed_url')
-            if not feed_url or url_is_from_any_domain(feed_url, self.domains):
+            if not feed_url or is_under_domains(feed_url, domains):
                 yield r
 
 
@@ -261,14 +302,18 @@ class FetchSourceSpiderMiddleware(OptionsContributor):
             raise NotConfigured()
 
     def process_spider_output(self, response, result, spider):
+        callback = self.parse_source
+        errback = self.handle_source_failure
         for data in result:
-            if isinstance(data, Request) or 'item' not in data or 'source_fetched' in data:
+            if isinstance(data, Request) or 'source_fetched' in data:
+                yield data
+                continue
+            item = data.get('item')
+            if item is None:
                 yield data
                 continue
-            item = data['item']
             yield Request(
-                item.url, callback=self.parse_source,
-                errback=self.handle_source_failure,
+                item.url, callback=callback, errback=errback,
                 meta={'data': data},
             )
 
@@ -279,7 +324,7 @@ class FetchSourceSpiderMiddleware(OptionsContributor):
         item = data['item']
         with suppress(AttributeError):
             if response.status >= 400:
-                self.logger.debug(f'Dropping {response}')
+                self.logger.debug('Dropping %s', response)
                 raise AttributeError
             body = response.text
             item.add_markup('webpage', body)
@@ -319,17 +364,19 @@ class CrawledItemSpiderMiddleware:
         path = settings['OUTPUT'] / 'crawled_items.txt'
         if path.exists():
             with open(path, 'r') as f:
-                self.crawled_items |= set(f.read().split('\n'))
+                self.crawled_items = {line.rstrip('\n') for line in f}
+            self.crawled_items.discard('')
         else:
             raise NotConfigured()
 
     def process_spider_output(self, response, result, spider):
+        crawled = self.crawled_items
         for data in result:
-            if isinstance(data, Request) or 'item' not in data:
+            if isinstance(data, Request):
                 yield data
                 continue
-            item = data['item']
-            if item.url not in self.crawled_items:
+            item = data.get('item')
+            if item is None or item.url not in crawled:
                 yield data
 
 
@@ -339,9 +386,7 @@ class AuthorizationDownloaderMiddleware:
             return
         auth = request.meta.get('auth')
         if auth:
-            request = request.copy()
             request.headers['Authorization'] = f'OAuth {auth}'
-            return request
 
 
 class HTTPErrorDownloaderMiddleware:
@@ -360,14 +405,14 @@ class HTTPErrorDownloaderMiddleware:
             self.log.warning('your either did not provide, or provided a wrong access token.')
             self.log.warning(f'URL: {request.url}')
             raise IgnoreRequest()
-        if response.status == 429 and urlsplit(request.url) == 'cloud.feedly.com':
+        if response.status == 429 and request.url.startswith(FEEDLY_API_PREFIXES):
             retry_after = response.headers.get('Retry-After')
             if retry_after:
-                retry_after = int(retry_after)
+                retry_after = parse_retry_after(retry_after)
                 self.log.warning('Server returned HTTP 429 Too Many Requests.')
                 self.log.warning('Either your IP address or your developer account is being rate-limited.')
-                self.log.warning(f'Retry-After = {retry_after}s')
-                self.log.warning(f'Scrapy will now pause for {retry_after}s')
+                self.log.warning(f'Retry-After = {retry_after:.0f}s')
+                self.log.warning(f'Scrapy will now pause for {retry_after:.0f}s')
                 spider.crawler.engine.pause()
                 to_sleep = retry_after * 1.2
                 try:
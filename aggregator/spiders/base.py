@@ -22,13 +22,16 @@
 
 from __future__ import annotations
 
+import logging
 import os
 import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pprint import pformat
 from typing import Optional, Union
+from urllib.parse import quote
 
+import attr
 from scrapy import Spider
 from scrapy.exceptions import CloseSpider
 from scrapy.http import Request, TextResponse
@@ -97,13 +100,16 @@ class FeedlyRSSSpider(Spider, ABC):
             'similar': 'true',
             'unreadOnly': 'false',
         }
+        streams_url = build_api_url('streams', streamId='\0', **self.api_base_params)
+        self.streams_url_parts = streams_url.split(quote('\0'), 1)
 
         self.freezer = None
         self.resume_iter = None
 
     def open_spider(self, spider):
         conf = self.config['SPIDER_CONFIG']
-        self.logger.info(f'Spider parameters:\n{pformat(conf.copy_to_dict())}')
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info('Spider parameters:\n%s', pformat(conf.copy_to_dict(), compact=True))
 
     @abstractmethod
     def start_requests(self):
@@ -159,6 +165,12 @@ class FeedlyRSSSpider(Spider, ABC):
         return True
 
     def get_streams_url(self, feed_id: str, **params) -> str:
+        if params.keys() <= {'continuation'}:
+            head, tail = self.streams_url_parts
+            url = f'{head}{quote(feed_id)}{tail}'
+            if params:
+                url = f'{url}&continuation={quote(str(params["continuation"]))}'
+            return url
         params = {**self.api_base_params, **params}
         return build_api_url('streams', streamId=feed_id, **params)
 
@@ -168,19 +180,19 @@ class FeedlyRSSSpider(Spider, ABC):
             try:
                 urls = build_urls(query, *select_templates(query, templates))
             except ValueError:
-                self.logger.debug(f'No template for {query}')
+                self.logger.debug('No template for %s', query)
                 urls = [query]
         else:
             urls = [query]
 
         prefix = self.config['STREAM_ID_PREFIX']
         meta = kwargs.pop('meta', {})
-        meta['try_feeds'] = {f'{prefix}{u}': None for u in urls}
+        meta['try_feeds'] = dict.fromkeys(f'{prefix}{u}' for u in urls)
         return ProbeFeed(url=query, callback=self.start_feeds, meta=meta, source=source, **kwargs)
 
     def start_feeds(self, response: TextResponse):
         meta = response.meta
-        self.signals.send_catch_log(request_finished, request=response.request.copy())
+        self.signals.send_catch_log(request_finished, request=response.request)
 
         del meta['is_probe']
         feeds = meta.get('valid_feeds')
@@ -214,10 +226,11 @@ class FeedlyRSSSpider(Spider, ABC):
             meta['no_filter'] = True
             meta.pop('inc_depth', None)
 
-        feed_url = get_feed_uri(feed)
-        meta['feed_url'] = feed_url
-
-        meta['pkey'] = (feed_url, 'main')
+        feed_url = None if initial else meta.get('feed_url')
+        if not feed_url:
+            feed_url = get_feed_uri(feed)
+            meta['feed_url'] = feed_url
+            meta['pkey'] = (feed_url, 'main')
 
         params = {}
         cont = data.get('continuation')
@@ -225,13 +238,13 @@ class FeedlyRSSSpider(Spider, ABC):
             params['continuation'] = cont
             meta['reason'] = 'continuation'
         elif not initial:
-            self.logger.info(f'Exhausted: {feed_url}')
-            self.signals.send_catch_log(request_finished, request=response.request.copy())
+            self.logger.info('Exhausted: %s', feed_url)
+            self.signals.send_catch_log(request_finished, request=response.request)
             return
 
         depth = meta.get('depth')
         reason = meta.get('reason')
-        self.logger.debug(f'initial={initial} depth={depth} reason={reason} {feed}')
+        self.logger.debug('initial=%s depth=%s reason=%s %s', initial, depth, reason, feed)
 
         url = self.get_streams_url(feed, **params)
         if response:
@@ -242,29 +255,30 @@ class FeedlyRSSSpider(Spider, ABC):
         if not response:
             return
 
-        data = guard_json(response.text)
+        data = guard_json(response.body)
         items = data.get('items')
         source = response.meta['feed_url']
         if items:
             response.meta['valid_feed'] = True
             if response.meta.get('reason') != 'continuation':
-                self.logger.info(_(f'Got new feed: {source}', color='green'))
+                self.logger.info(_('Got new feed: %s', color='green'), source)
 
         count = response.meta.get('item_scraped', 0)
+        depth = response.meta.get('depth', 0)
+        time_crawled = time.time()
         for item in items:
             entry = FeedlyEntry.from_upstream(item)
-            if not entry.source:
-                entry.source = {'feed': source}
             if not entry:
                 continue
+            if not entry.source:
+                entry = attr.evolve(entry, source=source)
 
             self.stats.inc_value('rss/page_count')
 
-            depth = response.meta.get('depth', 0)
             yield {
                 'item': entry,
                 'depth': depth,
-                'time_crawled': time.time(),
+                'time_crawled': time_crawled,
             }
             count += 1
         response.meta['item_scraped'] = count
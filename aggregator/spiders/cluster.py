@@ -102,10 +102,10 @@ class ExplorationSpiderMiddleware:
         sites = ({u for u, v in self._discovered.items() if v > self._threshold}
                  - self._scheduled)
         self._scheduled |= sites
-        self.logger.debug(f'depth={depth}; +{len(sites)}')
+        self.logger.debug('depth=%s; +%d', depth, len(sites))
 
         for url in sites:
-            self.logger.debug(f'{url} (depth={depth})')
+            self.logger.debug('%s (depth=%s)', url, depth)
             yield spider.probe_feed(
                 url, source=request,
                 meta={
@@ -176,11 +176,11 @@ class FeedClusterSpider(FeedlyRSSSpider, OptionsContributor, _doc_order=9):
                 yield self.next_page({'id': feed}, meta=meta, initial=True)
             return
 
-        select = self.config.get('SELECT_FEED_STATE', 'all')
+        strat = self.SELECTION_STRATS[self.config.get('SELECT_FEED_STATE', 'all')]
         for feed, dead in feeds.items():
-            prio = self.SELECTION_STRATS[select][dead]
+            prio = strat[dead]
             if not prio:
-                self.logger.info(_(f'Dropped {"dead" if dead else "living"} feed {feed[5:]}', color='grey'))
+                self.logger.info(_('Dropped %s feed %s', color='grey'), 'dead' if dead else 'living', feed[5:])
             else:
                 yield self.next_page({'id': feed}, meta=meta, initial=True, priority=prio)
 
@@ -21,12 +21,20 @@
 # SOFTWARE.
 
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 from urllib.parse import unquote
 
 from scrapy.utils.url import add_http_if_no_scheme
 
+from ..urlkit import sort_templates
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern):
+    return re.compile(pattern)
+
 
 def single_item(f):
     def wrapped(*args, **kwargs):
@@ -48,7 +56,8 @@ class SettingsAdapter:
     @staticmethod
     @single_item
     def rss_templates(conf):
-        return {re.compile(k): v for k, v in conf.items()}
+        return {compile_pattern(k): v if callable(v) else sort_templates(v)
+                for k, v in conf.items()}
 
     @staticmethod
     @single_item
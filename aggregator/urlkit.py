@@ -20,7 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Tuple
+from typing import FrozenSet, Mapping, Tuple
 from urllib.parse import SplitResult, urlsplit
 
 from .datastructures import labeled_sequence
@@ -47,6 +47,16 @@ def domain_parents(domain: str) -> Tuple[str]:
     return tuple('.'.join(parts[-i:]) for i in range(len(parts), 1, -1))
 
 
+def is_under_domains(url: str, domains: FrozenSet[str]) -> bool:
+    host = urlsplit(url).hostname
+    if not host:
+        return False
+    if host in domains:
+        return True
+    labels = host.split('.')
+    return any('.'.join(labels[i:]) in domains for i in range(1, len(labels)))
+
+
 def no_scheme(url: SplitResult) -> str:
     return url.geturl()[len(f'{url.scheme}:'):]
 
@@ -56,17 +66,21 @@ def path_only(url: SplitResult) -> str:
 
 
 def select_templates(query, template_tree):
-    matches = {r: r.match(query) for r in template_tree}
-    matches = [(r, m) for r, m in matches.items() if m]
-    if not matches:
+    for pattern, templates in template_tree.items():
+        match = pattern.match(query)
+        if match:
+            break
+    else:
         raise ValueError('No template provider')
-    pattern, match = matches[0]
-    templates = template_tree[pattern]
-    if not callable(templates):
-        templates = [t[0] for t in templates.items()]
+    if isinstance(templates, Mapping):
+        templates = sort_templates(templates)
     return match, templates
 
 
+def sort_templates(templates):
+    return tuple(sorted(templates, key=templates.get))
+
+
 def build_urls(base, match, templates):
     parsed = urlsplit(base)
     if callable(templates):
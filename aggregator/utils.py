@@ -48,6 +48,11 @@ except ImportError:
     def colored(t, *args, **kwargs):
         return t
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 JSONType = Union[str, bool, int, float, None, List['JSONType'], Dict[str, 'JSONType']]
 JSONDict = Dict[str, JSONType]
 SpiderOutput = List[Union[JSONDict, Request]]
@@ -127,7 +132,7 @@ def json_converters(value: Any) -> JSONType:
 
 
 def load_jsonlines(file) -> List[JSONDict]:
-    return [json.loads(line) for line in file.read().split('\n') if line]
+    return [json_loadb(line) for line in file if line.strip()]
 
 
 def datetime_converters(dt: Union[str, int, float, datetime], tz=timezone.utc) -> datetime:
@@ -215,10 +220,22 @@ def watch_for_len(name, col, limit=0, comp=gt, desc='fewer than'):
             logging.getLogger('profiler.containerlen').log(level, message)
 
 
-def guard_json(text: str) -> JSONDict:
+def json_loadb(s: Union[str, bytes]) -> JSONType:
+    if orjson:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def json_dumpb(obj: JSONType) -> bytes:
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def guard_json(text: Union[str, bytes]) -> JSONDict:
     try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
+        return json_loadb(text)
+    except ValueError as e:
         log.error(e)
         return {}
 
@@ -241,14 +258,13 @@ def read_jsonlines(f, *, delimiter='\0\n', on_error='raise', paginate=100000, on
             continue
 
         try:
-            yield i, k, json.loads(next_line.rstrip())
+            yield i, k, json_loadb(next_line.rstrip())
 
-        except json.JSONDecodeError:
+        except ValueError:
             if on_error == 'raise':
                 raise
-            if on_error == 'continue':
-                continue
-            return
+            if on_error != 'continue':
+                return
 
         next_line = f.readline()
 